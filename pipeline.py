@@ -1,15 +1,19 @@
 import argparse
 import datetime
 import logging.config
+import shutil
 from pathlib import Path
 import yaml
 
 import src.acquire_data as ad
 import src.analysis as eda
 import src.aws_utils as aws
+import src.benchmark_models as bm
 import src.create_dataset as cd
 import src.evaluate_performance as ep
+import src.feature_importance as fi
 import src.generate_features as gf
+import src.run_registry as rr
 import src.score_model as sm
 import src.train_model as tm
 
@@ -50,45 +54,136 @@ if __name__ == "__main__":
     with open(artifacts_dir / "config.yaml", "w") as f:
         yaml.dump(config, f)
 
+    timings = {}
+
     # Step 1: Acquire data
-    ad.acquire_data(url=config["data_source"]["url"], save_path=Path(paths["raw_data"]))
+    with rr.stage_timer(timings, "acquire_data"):
+        ad.acquire_data(url=config["data_source"]["url"], save_path=Path(paths["raw_data"]))
 
     # Step 2: Create structured dataset
-    data = cd.create_dataset(Path(paths["raw_data"]), config["data_source"])
-    cd.save_dataset(data, Path(paths["cleaned_data"]))
+    with rr.stage_timer(timings, "create_dataset"):
+        data = cd.create_dataset(Path(paths["raw_data"]), config["data_source"])
+        cd.save_dataset(data, Path(paths["cleaned_data"]))
 
     # Step 3: Feature generation
-    features = gf.generate_features(data, config["generate_features"])
-    cd.save_dataset(features, Path(paths["features_data"]))
+    with rr.stage_timer(timings, "generate_features"):
+        features = gf.generate_features(data, config["generate_features"])
+        cd.save_dataset(features, Path(paths["features_data"]))
 
-    features = gf.generate_labels(
-        features, method=config["labeling"]["method"], config=config["labeling"]
-    )
+        features = gf.generate_labels(
+            features, method=config["labeling"]["method"], config=config["labeling"]
+        )
 
-    features = features.drop(columns=["IR_mean"])
+        features.drop(columns=["IR_mean"], inplace=True)
+        del data
     # Step 4: EDA figures (optional)
-    figures_dir = artifacts_dir / "figures"
-    figures_dir.mkdir(exist_ok=True)
-    eda.save_figures(features, figures_dir)
+    with rr.stage_timer(timings, "eda"):
+        figures_dir = artifacts_dir / "figures"
+        figures_dir.mkdir(exist_ok=True)
+        eda.save_figures(features, figures_dir)
+
+    split_mode = config["model"].get("split", {}).get("mode", "index")
+    if split_mode == "index":
+        # Share one feature matrix between training and scoring; the split is row indices only
+        row_ids = features.index.to_numpy()
+        X, y, feature_names = tm.to_matrix(features, config["model"]["target_column"])
+        del features
 
     # Step 5: Model training
-    model, train_df, test_df = tm.train_model(features, config["model"])
-    tm.save_data(train_df, test_df, artifacts_dir)
-    tm.save_model(model, Path(paths["model_output"]))
+    with rr.stage_timer(timings, "train_model"):
+        auto_size = config["model"].get("auto_size", {}).get("enabled", False)
+        if auto_size and config["model"].get("type", "RandomForestClassifier") != "RandomForestClassifier":
+            logger.warning("model.auto_size only applies to RandomForestClassifier; ignoring it.")
+            auto_size = False
+        if split_mode == "index":
+            train_idx, test_idx = tm.split_indices(y, config["model"])
+            if auto_size:
+                model, growth_curve = tm.grow_forest(X, y, train_idx, config["model"], feature_names)
+                tm.save_growth_curve(growth_curve, artifacts_dir)
+            else:
+                model = tm.fit_model(X, y, train_idx, config["model"], feature_names)
+            tm.save_split(train_idx, test_idx, artifacts_dir, row_ids=row_ids)
+        else:
+            if auto_size:
+                logger.warning("model.auto_size requires split mode 'index'; training a fixed-size forest.")
+            model, train_df, test_df = tm.train_model(features, config["model"])
+            tm.save_data(train_df, test_df, artifacts_dir)
+        tm.save_model(model, artifacts_dir / "model.pkl")
+        # models/ holds a copy of the latest run's artifacts for convenience
+        tm.save_model(model, Path(paths["model_output"]))
 
     # Step 6: Score model
-    scores = sm.score_model(test_df, model, config["model"])
-    sm.save_scores(scores, artifacts_dir / "scores.csv")
+    with rr.stage_timer(timings, "score_model"):
+        if split_mode == "index":
+            scores = sm.score_indices(X, y, test_idx, model, config["model"])
+        else:
+            scores = sm.score_model(test_df, model, config["model"])
+        sm.save_scores(scores, artifacts_dir / "scores.csv")
 
     # Step 7: Evaluate performance
-    metrics = ep.evaluate_performance(scores, config["evaluation"])
-    ep.save_metrics(metrics, Path(paths["metrics_output"]))
-
-    # Step 8: Optional chart generation
+    with rr.stage_timer(timings, "evaluate_performance"):
+        metrics = ep.evaluate_performance(scores, config["evaluation"])
+        if hasattr(model, "estimators_"):
+            metrics["n_estimators"] = len(model.estimators_)
+        sweep_config = config["evaluation"].get("threshold_sweep", {})
+        if sweep_config.get("enabled", False):
+            sweep = ep.threshold_sweep(scores["y_true"], scores["y_proba"])
+            ep.save_sweep(sweep, artifacts_dir / "threshold_sweep.csv")
+            operating_point = ep.optimal_threshold(sweep, sweep_config.get("objective", "f1"))
+            # Tie the threshold to the model it was tuned for
+            operating_point["model_type"] = config["model"].get("type", "RandomForestClassifier")
+            operating_point["run_dir"] = str(artifacts_dir.resolve())
+            ep.save_metrics(operating_point, Path(paths["threshold_output"]))
+            ep.save_metrics(operating_point, artifacts_dir / "threshold.json")
+            metrics["average_precision"] = ep.sweep_auc(sweep)["average_precision"]
+            metrics["optimal_threshold"] = operating_point["threshold"]
+            # Macro F1, comparable with metrics["f1"]
+            metrics["f1_at_threshold"] = operating_point["f1_macro"]
+        ep.save_metrics(metrics, Path(paths["metrics_output"]))
+        ep.save_metrics(metrics, artifacts_dir / "metrics.json")
+
+    # Step 8: Optional permutation feature importance
+    if config.get("feature_importance", {}).get("enabled", False):
+        if split_mode == "index":
+            with rr.stage_timer(timings, "feature_importance"):
+                importance = fi.permutation_importance(
+                    X, y, model, feature_names, config["feature_importance"], rows=test_idx
+                )
+                fi.save_importance(importance, artifacts_dir / "feature_importance.csv")
+        else:
+            logger.warning("feature_importance requires split mode 'index'; skipping it.")
+
+    # Step 9: Optional side-by-side benchmark of model backends
+    if config.get("benchmark", {}).get("enabled", False):
+        if split_mode == "index":
+            with rr.stage_timer(timings, "benchmark"):
+                benchmark = bm.benchmark_models(
+                    X, y, train_idx, test_idx, config["model"], config["benchmark"], config["evaluation"]
+                )
+                bm.save_benchmark(benchmark, artifacts_dir / "benchmark.csv")
+        else:
+            logger.warning("benchmark requires split mode 'index'; skipping it.")
+
+    # Step 10: Optional chart generation
     if config["evaluation"].get("plot_roc", False):
-        ep.plot_roc_curve(scores, Path(paths["chart_output"]))
+        with rr.stage_timer(timings, "plot_roc"):
+            ep.plot_roc_curve(scores, artifacts_dir / "roc_curve.png")
+            Path(paths["chart_output"]).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(artifacts_dir / "roc_curve.png", paths["chart_output"])
 
-    # Step 9: Upload to S3
+    # Step 11: Upload to S3
     if config["aws"].get("upload", False):
-        aws.upload_artifacts(artifacts_dir, config["aws"])
-        aws.upload_artifacts(Path("models"), config["aws"])
+        with rr.stage_timer(timings, "upload"):
+            aws.upload_artifacts(artifacts_dir, config["aws"])
+            aws.upload_artifacts(Path("models"), config["aws"])
+
+    # Step 12: Index the run
+    if config.get("registry", {}).get("enabled", False):
+        rr.record_run(
+            Path(config["registry"]["path"]),
+            name=run_config["name"],
+            artifacts_dir=artifacts_dir,
+            config=config,
+            metrics=metrics,
+            timings=timings,
+        )
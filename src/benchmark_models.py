@@ -0,0 +1,104 @@
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Any
+import numpy as np
+import pandas as pd
+
+import src.evaluate_performance as ep
+import src.score_model as sm
+import src.train_model as tm
+
+# Logger configuration
+logger = logging.getLogger("model_benchmark")
+
+
+def benchmark_models(
+    X: np.ndarray,
+    y: np.ndarray,
+    train_idx: np.ndarray,
+    test_idx: np.ndarray,
+    model_config: Dict[str, Any],
+    benchmark_config: Dict[str, Any],
+    eval_config: Dict[str, Any],
+) -> pd.DataFrame:
+    """
+    Train and score each configured model backend on the same train/test split.
+
+    Test rows are gathered in batches of 'batch_size', and only the
+    `predict_proba` calls count towards the inference latency.
+
+    Args:
+        X: Shared feature matrix.
+        y: Target vector.
+        train_idx: Row positions to train on.
+        test_idx: Row positions to score.
+        model_config: Model config; its 'type' and 'params' are replaced per backend.
+        benchmark_config: Dict with 'backends' mapping backend type to its params.
+        eval_config: Evaluation config passed to `evaluate_performance`.
+
+    Returns:
+        DataFrame with one row per backend: training time, inference latency and metrics.
+    """
+    try:
+        results = []
+        for model_type, params in benchmark_config["backends"].items():
+            logger.info("Benchmarking %s.", model_type)
+            config = {**model_config, "type": model_type, "params": params or {}}
+
+            start = time.perf_counter()
+            model = tm.fit_model(X, y, train_idx, config)
+            fit_seconds = time.perf_counter() - start
+
+            # Only the predict_proba calls are timed, not gathering the test rows
+            batch_size = config.get("batch_size", 65536)
+            proba = np.empty((len(test_idx), len(model.classes_)), dtype=np.float64)
+            predict_seconds = 0.0
+            for start in range(0, len(test_idx), batch_size):
+                batch = sm.model_input(model, X[test_idx[start:start + batch_size]])
+                tic = time.perf_counter()
+                proba[start:start + len(batch)] = model.predict_proba(batch)
+                predict_seconds += time.perf_counter() - tic
+
+            scores = pd.DataFrame({
+                "y_true": y[test_idx],
+                "y_pred": model.classes_[proba.argmax(axis=1)],
+                "y_proba": proba[:, 1],
+            })
+            metrics = ep.evaluate_performance(scores, eval_config)
+            results.append({
+                "model": model_type,
+                "fit_seconds": fit_seconds,
+                "predict_seconds": predict_seconds,
+                "predict_ms_per_1k_rows": predict_seconds * 1000 / len(test_idx) * 1000,
+                **metrics,
+            })
+
+        results = pd.DataFrame(results)
+        logger.info("Benchmark results:\n%s", results.to_string(index=False))
+        return results
+
+    except KeyError as e:
+        logger.error("Missing config key: %s", e)
+        raise ValueError(f"Missing config key: {e}")
+    except Exception as e:
+        logger.exception("Model benchmark failed.")
+        raise RuntimeError(f"Benchmark failed: {e}")
+
+
+def save_benchmark(results: pd.DataFrame, path: Path) -> None:
+    """
+    Save benchmark results to CSV.
+
+    Args:
+        results: Benchmark results DataFrame.
+        path: File path to save.
+    """
+    try:
+        logger.info("Saving benchmark results to %s", path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        results.to_csv(path, index=False)
+        logger.info("Benchmark results saved.")
+    except Exception as e:
+        logger.exception("Failed to save benchmark results.")
+        raise IOError(f"Could not save benchmark results: {e}")
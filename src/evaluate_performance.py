@@ -4,6 +4,7 @@ from pathlib import Path
 from typing import Dict, Any
 import matplotlib.pyplot as plt
 from sklearn.metrics import RocCurveDisplay, accuracy_score, f1_score, roc_auc_score
+import numpy as np
 import pandas as pd
 
 # Logger configuration
@@ -34,6 +35,128 @@ def evaluate_performance(scores_df: pd.DataFrame, config: Dict[str, Any]) -> Dic
         raise RuntimeError(f"Evaluation failed: {e}")
 
 
+def threshold_sweep(y_true: np.ndarray, y_score: np.ndarray, pos_label: int = 1) -> pd.DataFrame:
+    """
+    Compute ROC/PR curves and confusion-matrix metrics at every distinct threshold.
+
+    Scores are sorted once and true/false positive counts are accumulated with a
+    cumulative sum, so the whole sweep costs O(n log n). Row i holds the metrics
+    for predicting positive when score >= threshold; the first row (threshold inf)
+    predicts everything negative.
+
+    Args:
+        y_true: True labels.
+        y_score: Positive-class scores.
+        pos_label: Label of the positive class.
+
+    Returns:
+        DataFrame with 'threshold', 'tp', 'fp', 'tn', 'fn', 'tpr', 'fpr', 'precision',
+        'recall', 'f1' (positive class), 'f1_macro', 'accuracy' and 'youden' columns,
+        in decreasing threshold order.
+    """
+    try:
+        y_true = np.asarray(y_true) == pos_label
+        y_score = np.asarray(y_score, dtype=np.float64)
+        order = np.argsort(-y_score, kind="mergesort")
+        y_score, y_true = y_score[order], y_true[order]
+
+        # Last position of each run of tied scores
+        last = np.r_[np.flatnonzero(np.diff(y_score)), len(y_score) - 1]
+        tp = np.r_[0, np.cumsum(y_true)[last]]
+        fp = np.r_[0, last + 1] - tp
+        thresholds = np.r_[np.inf, y_score[last]]
+
+        n_pos, n_neg = int(y_true.sum()), int(len(y_true) - y_true.sum())
+        fn, tn = n_pos - tp, n_neg - fp
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tpr = tp / n_pos if n_pos else np.zeros(len(tp))
+            fpr = fp / n_neg if n_neg else np.zeros(len(fp))
+            precision = np.where(tp + fp > 0, tp / (tp + fp), 1.0)
+            f1 = np.where(tp > 0, 2 * tp / (2 * tp + fp + fn), 0.0)
+            f1_neg = np.where(tn > 0, 2 * tn / (2 * tn + fp + fn), 0.0)
+
+        return pd.DataFrame({
+            "threshold": thresholds,
+            "tp": tp,
+            "fp": fp,
+            "tn": tn,
+            "fn": fn,
+            "tpr": tpr,
+            "fpr": fpr,
+            "precision": precision,
+            "recall": tpr,
+            "f1": f1,
+            "f1_macro": (f1 + f1_neg) / 2,
+            "accuracy": (tp + tn) / len(y_true),
+            "youden": tpr - fpr,
+        })
+    except Exception as e:
+        logger.exception("Error computing threshold sweep.")
+        raise RuntimeError(f"Threshold sweep failed: {e}")
+
+
+def sweep_auc(sweep: pd.DataFrame) -> Dict[str, float]:
+    """
+    Compute ROC AUC and average precision from a threshold sweep.
+
+    Args:
+        sweep: Output of `threshold_sweep`.
+
+    Returns:
+        Dict with 'roc_auc' and 'average_precision'.
+    """
+    fpr, tpr = sweep["fpr"].to_numpy(), sweep["tpr"].to_numpy()
+    recall, precision = sweep["recall"].to_numpy(), sweep["precision"].to_numpy()
+    return {
+        "roc_auc": float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2)),
+        "average_precision": float(np.sum(np.diff(recall) * precision[1:])),
+    }
+
+
+def optimal_threshold(sweep: pd.DataFrame, objective: str = "f1") -> Dict[str, float]:
+    """
+    Select the operating point that maximizes an objective over a threshold sweep.
+
+    Args:
+        sweep: Output of `threshold_sweep`.
+        objective: Sweep column to maximize, e.g. 'f1', 'f1_macro', 'youden' or 'accuracy'.
+
+    Returns:
+        Dict with the chosen 'threshold', the 'objective' name and the sweep metrics at that point.
+    """
+    if objective not in sweep.columns or objective in ("threshold", "tp", "fp", "tn", "fn"):
+        raise ValueError(f"Unknown threshold objective: {objective}")
+    # Skip the predict-nothing row so the threshold is always a finite score
+    candidates = sweep.iloc[1:]
+    best = candidates.loc[candidates[objective].idxmax()]
+    operating_point = {
+        "threshold": float(best["threshold"]),
+        "objective": objective,
+        **{col: float(best[col]) for col in ("precision", "recall", "f1", "f1_macro", "accuracy", "tpr", "fpr")},
+    }
+    logger.info("Optimal threshold by %s: %.4f (%s=%.4f)", objective, operating_point["threshold"],
+                objective, best[objective])
+    return operating_point
+
+
+def save_sweep(sweep: pd.DataFrame, path: Path) -> None:
+    """
+    Save a threshold sweep to CSV.
+
+    Args:
+        sweep: Output of `threshold_sweep`.
+        path: File path to save.
+    """
+    try:
+        logger.info("Saving threshold sweep to %s", path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        sweep.to_csv(path, index=False)
+        logger.info("Threshold sweep saved.")
+    except Exception as e:
+        logger.exception("Failed to save threshold sweep.")
+        raise IOError(f"Could not save threshold sweep: {e}")
+
+
 def save_metrics(metrics: Dict[str, float], path: Path) -> None:
     """
     Save evaluation metrics to a JSON file.
@@ -63,10 +186,12 @@ def plot_roc_curve(scores_df: pd.DataFrame, save_path: Path) -> None:
     """
     try:
         logger.info("Plotting ROC curve.")
-        RocCurveDisplay.from_predictions(
-            y_true=scores_df["y_true"],
-            y_pred=scores_df["y_proba"]
-        )
+        sweep = threshold_sweep(scores_df["y_true"], scores_df["y_proba"])
+        RocCurveDisplay(
+            fpr=sweep["fpr"].to_numpy(),
+            tpr=sweep["tpr"].to_numpy(),
+            roc_auc=sweep_auc(sweep)["roc_auc"],
+        ).plot()
         plt.title("ROC Curve")
         save_path.parent.mkdir(parents=True, exist_ok=True)
         plt.savefig(save_path)
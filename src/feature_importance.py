@@ -0,0 +1,279 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, f1_score, roc_auc_score
+
+from src.score_model import model_input
+
+# Logger configuration
+logger = logging.getLogger("feature_importance")
+
+# Per-process state set up once by `_init_worker` and reused for every feature
+_worker_state: Dict[str, Any] = {}
+
+
+def _score(y_true: np.ndarray, proba: np.ndarray, classes: np.ndarray, metric: str) -> float:
+    """
+    Score predicted probabilities with a higher-is-better metric.
+
+    Args:
+        y_true: True labels.
+        proba: Output of `predict_proba`.
+        classes: The model's `classes_`.
+        metric: 'roc_auc', 'accuracy' or 'f1' (macro).
+
+    Returns:
+        Metric value.
+    """
+    if metric == "roc_auc":
+        return roc_auc_score(y_true, proba[:, 1])
+    y_pred = classes[proba.argmax(axis=1)]
+    if metric == "accuracy":
+        return accuracy_score(y_true, y_pred)
+    if metric == "f1":
+        return f1_score(y_true, y_pred, average="macro")
+    raise ValueError(f"Unknown importance metric: {metric}")
+
+
+def _predict_proba(model: Any, X: np.ndarray, rows: np.ndarray, max_batch_rows: int) -> np.ndarray:
+    """
+    Predict class probabilities for rows of X, gathered in chunks of at most `max_batch_rows`.
+
+    Args:
+        model: Trained model with `predict_proba`.
+        X: Feature matrix.
+        rows: Row positions to predict.
+        max_batch_rows: Maximum rows per prediction call.
+
+    Returns:
+        Output of `predict_proba` for the selected rows.
+    """
+    proba = np.empty((len(rows), len(model.classes_)), dtype=np.float64)
+    for start in range(0, len(rows), max_batch_rows):
+        batch = X[rows[start:start + max_batch_rows]]
+        proba[start:start + len(batch)] = model.predict_proba(model_input(model, batch))
+    return proba
+
+
+def _init_worker(X_eval: np.ndarray, y_eval: np.ndarray, model: Any, metric: str,
+                 n_repeats: int, max_batch_rows: int) -> None:
+    """
+    Store the evaluation data and model and allocate the reusable permutation buffer.
+
+    The buffer never holds more than `max_batch_rows` rows. When the evaluation
+    rows fit, it stacks them once per repeat so one `predict_proba` call scores
+    several permutations of a feature at once; otherwise it holds one chunk of
+    rows and each permutation is scored chunk by chunk.
+
+    Args:
+        X_eval: Evaluation feature matrix.
+        y_eval: Evaluation labels.
+        model: Trained model with `predict_proba`.
+        metric: Metric passed to `_score`.
+        n_repeats: Permutations per feature.
+        max_batch_rows: Upper bound on buffer rows.
+    """
+    n_rows = len(X_eval)
+    repeats_per_batch = min(n_repeats, max_batch_rows // max(n_rows, 1))
+    if repeats_per_batch >= 1:
+        buffer = np.tile(X_eval, (repeats_per_batch, 1))
+    else:
+        buffer = np.empty((max_batch_rows, X_eval.shape[1]), dtype=X_eval.dtype)
+    _worker_state.update(
+        X_eval=X_eval,
+        y_eval=y_eval,
+        model=model,
+        metric=metric,
+        n_repeats=n_repeats,
+        repeats_per_batch=repeats_per_batch,
+        buffer=buffer,
+    )
+
+
+def _attach_worker(shm_name: str, shape: Tuple[int, int], dtype: str, *args: Any) -> None:
+    """
+    Initialize a pool worker on an evaluation matrix held in shared memory.
+
+    Workers map the parent's copy of the matrix instead of each receiving a
+    pickled one.
+
+    Args:
+        shm_name: Name of the shared memory block holding the matrix.
+        shape: Matrix shape.
+        dtype: Matrix dtype string.
+        *args: Remaining `_init_worker` arguments.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _init_worker(np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf), *args)
+    # Keep the mapping alive for the lifetime of the worker
+    _worker_state["shm"] = shm
+
+
+def _permute_feature(feature: int, seed: int) -> np.ndarray:
+    """
+    Score the model with one feature shuffled, `n_repeats` times.
+
+    When the worker buffer stacks several copies of the evaluation rows, the
+    feature's column is shuffled in place in every block, the whole batch is
+    scored with one prediction call, and the column is then restored. When the
+    evaluation rows exceed the buffer, each permuted column is scored in row
+    chunks copied into the buffer.
+
+    Args:
+        feature: Column index to permute.
+        seed: Base random seed; combined with the column index so results do
+            not depend on which worker handles the feature.
+
+    Returns:
+        Array of `n_repeats` permuted scores.
+    """
+    state = _worker_state
+    X_eval, buffer, n_rows = state["X_eval"], state["buffer"], len(state["X_eval"])
+    model, repeats_per_batch = state["model"], state["repeats_per_batch"]
+    rng = np.random.default_rng([seed, feature])
+    scores = []
+
+    if repeats_per_batch == 0:
+        chunk_rows = len(buffer)
+        for _ in range(state["n_repeats"]):
+            permuted = rng.permutation(X_eval[:, feature])
+            proba = np.empty((n_rows, len(model.classes_)), dtype=np.float64)
+            for start in range(0, n_rows, chunk_rows):
+                stop = min(start + chunk_rows, n_rows)
+                rows = buffer[:stop - start]
+                rows[:] = X_eval[start:stop]
+                rows[:, feature] = permuted[start:stop]
+                proba[start:stop] = model.predict_proba(model_input(model, rows))
+            scores.append(_score(state["y_eval"], proba, model.classes_, state["metric"]))
+        return np.array(scores)
+
+    for start in range(0, state["n_repeats"], repeats_per_batch):
+        repeats = min(repeats_per_batch, state["n_repeats"] - start)
+        for r in range(repeats):
+            rng.shuffle(buffer[r * n_rows:(r + 1) * n_rows, feature])
+        proba = model.predict_proba(model_input(model, buffer[:repeats * n_rows]))
+        for r in range(repeats):
+            block = proba[r * n_rows:(r + 1) * n_rows]
+            scores.append(_score(state["y_eval"], block, model.classes_, state["metric"]))
+            buffer[r * n_rows:(r + 1) * n_rows, feature] = X_eval[:, feature]
+    return np.array(scores)
+
+
+def _run_pool(X: np.ndarray, rows: np.ndarray, init_args: Tuple[Any, ...], features: range, seed: int,
+              n_jobs: int) -> List[np.ndarray]:
+    """
+    Permute features across a process pool that shares the evaluation matrix.
+
+    The evaluation rows are gathered from X straight into shared memory, so the
+    parent holds a single copy of them.
+
+    Args:
+        X: Feature matrix.
+        rows: Row positions to evaluate on.
+        init_args: `_init_worker` arguments after the matrix.
+        features: Column indices to permute.
+        seed: Base random seed.
+        n_jobs: Number of worker processes.
+
+    Returns:
+        Permuted scores per feature, in feature order.
+    """
+    shape = (len(rows), X.shape[1])
+    shm = shared_memory.SharedMemory(create=True, size=max(len(rows) * X.shape[1] * X.dtype.itemsize, 1))
+    try:
+        # The view is dropped right away so the block can be closed afterwards
+        np.take(X, rows, axis=0, out=np.ndarray(shape, dtype=X.dtype, buffer=shm.buf))
+        with ProcessPoolExecutor(
+            max_workers=n_jobs,
+            initializer=_attach_worker,
+            initargs=(shm.name, shape, X.dtype.str, *init_args),
+        ) as pool:
+            return list(pool.map(_permute_feature, features, [seed] * len(features)))
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def permutation_importance(X: np.ndarray, y: np.ndarray, model: Any, feature_names: List[str],
+                           config: Dict[str, Any], rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+    """
+    Compute permutation feature importance, spreading features across a process pool.
+
+    Importance is the drop in the metric when a feature's values are shuffled,
+    averaged over 'n_repeats' permutations.
+
+    Args:
+        X: Feature matrix.
+        y: Target vector.
+        model: Trained model with `predict_proba`.
+        feature_names: Names of the columns of X.
+        config: Dict with optional 'metric', 'n_repeats', 'n_jobs', 'max_batch_rows' and 'random_state'.
+        rows: Row positions to evaluate on (e.g. the test rows); all rows when omitted.
+
+    Returns:
+        DataFrame ranked by mean importance, with 'feature', 'importance_mean',
+        'importance_std' and 'baseline_score' columns.
+    """
+    try:
+        metric = config.get("metric", "roc_auc")
+        n_repeats = config.get("n_repeats", 5)
+        max_batch_rows = config.get("max_batch_rows", 1_000_000)
+        seed = config.get("random_state", 42)
+        n_jobs = config.get("n_jobs") or -1
+        n_jobs = os.cpu_count() if n_jobs == -1 else n_jobs
+        n_jobs = min(n_jobs, len(feature_names))
+
+        rows = np.arange(len(X)) if rows is None else np.asarray(rows)
+        y_eval = y[rows]
+
+        baseline = _score(y_eval, _predict_proba(model, X, rows, max_batch_rows), model.classes_, metric)
+        logger.info("Permutation importance on %d rows x %d features (%d repeats, %d processes), baseline %s %.4f",
+                    len(rows), len(feature_names), n_repeats, n_jobs, metric, baseline)
+
+        init_args = (y_eval, model, metric, n_repeats, max_batch_rows)
+        features = range(len(feature_names))
+        if n_jobs > 1:
+            permuted = _run_pool(X, rows, init_args, features, seed, n_jobs)
+        else:
+            try:
+                _init_worker(X[rows], *init_args)
+                permuted = [_permute_feature(feature, seed) for feature in features]
+            finally:
+                _worker_state.clear()
+
+        drops = baseline - np.vstack(permuted)
+        importance = pd.DataFrame({
+            "feature": feature_names,
+            "importance_mean": drops.mean(axis=1),
+            "importance_std": drops.std(axis=1),
+            "baseline_score": baseline,
+        }).sort_values("importance_mean", ascending=False, ignore_index=True)
+        logger.info("Permutation importance:\n%s", importance.to_string(index=False))
+        return importance
+
+    except Exception as e:
+        logger.exception("Permutation importance failed.")
+        raise RuntimeError(f"Permutation importance failed: {e}")
+
+
+def save_importance(importance: pd.DataFrame, path: Path) -> None:
+    """
+    Save ranked feature importances to CSV.
+
+    Args:
+        importance: Output of `permutation_importance`.
+        path: File path to save.
+    """
+    try:
+        logger.info("Saving feature importance to %s", path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        importance.to_csv(path, index=False)
+        logger.info("Feature importance saved.")
+    except Exception as e:
+        logger.exception("Failed to save feature importance.")
+        raise IOError(f"Could not save feature importance: {e}")
@@ -0,0 +1,483 @@
+import argparse
+import contextlib
+import hashlib
+import json
+import logging
+import shutil
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional
+import yaml
+
+# Logger configuration
+logger = logging.getLogger("run_registry")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    artifacts_dir TEXT NOT NULL UNIQUE,
+    config_hash TEXT NOT NULL,
+    config_json TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    total_seconds REAL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    path TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    PRIMARY KEY (run_id, path)
+);
+CREATE TABLE IF NOT EXISTS timings (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    stage TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    PRIMARY KEY (run_id, stage)
+);
+CREATE INDEX IF NOT EXISTS idx_runs_created_at ON runs(created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_config_hash ON runs(config_hash);
+CREATE INDEX IF NOT EXISTS idx_metrics_name_value ON metrics(name, value);
+"""
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    """
+    Open the registry database, creating the file and schema if needed.
+
+    Args:
+        db_path: Path to the SQLite registry file.
+
+    Returns:
+        Open SQLite connection with foreign keys enabled.
+    """
+    try:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.executescript(SCHEMA)
+        return conn
+    except sqlite3.Error as e:
+        logger.exception("Failed to open run registry.")
+        raise IOError(f"Could not open run registry {db_path}: {e}")
+
+
+def config_hash(config: Dict[str, Any]) -> str:
+    """
+    Compute a stable hash of a configuration dict.
+
+    Args:
+        config: Pipeline configuration.
+
+    Returns:
+        Hex SHA-256 digest of the key-sorted JSON encoding.
+    """
+    encoded = json.dumps(config, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+@contextlib.contextmanager
+def stage_timer(timings: Dict[str, float], stage: str) -> Iterator[None]:
+    """
+    Record the wall-clock duration of a pipeline stage.
+
+    Args:
+        timings: Dict the elapsed seconds are written into.
+        stage: Stage name used as the key.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = time.perf_counter() - start
+        logger.debug("Stage %s took %.3fs", stage, timings[stage])
+
+
+def collect_artifacts(paths: List[Path]) -> Dict[str, int]:
+    """
+    Collect file paths and sizes from files and directories.
+
+    Args:
+        paths: Files or directories to include; directories are walked recursively.
+
+    Returns:
+        Dict mapping file path to size in bytes.
+    """
+    artifacts = {}
+    for path in paths:
+        path = path.resolve()
+        if path.is_dir():
+            for file in sorted(path.rglob("*")):
+                if file.is_file():
+                    artifacts[str(file)] = file.stat().st_size
+        elif path.is_file():
+            artifacts[str(path)] = path.stat().st_size
+    return artifacts
+
+
+def record_run(
+    db_path: Path,
+    name: str,
+    artifacts_dir: Path,
+    config: Dict[str, Any],
+    metrics: Dict[str, float],
+    timings: Dict[str, float],
+    artifact_paths: Optional[List[Path]] = None,
+) -> int:
+    """
+    Insert a finished run into the registry.
+
+    Args:
+        db_path: Path to the SQLite registry file.
+        name: Run name from 'run_config'.
+        artifacts_dir: Directory holding the run's artifacts; stored as an absolute path.
+        config: Configuration the run used.
+        metrics: Evaluation metrics.
+        timings: Seconds spent per stage.
+        artifact_paths: Files or directories to index (default: artifacts_dir).
+
+    Returns:
+        The new run id.
+    """
+    artifacts = collect_artifacts(artifact_paths or [artifacts_dir])
+    try:
+        with contextlib.closing(connect(db_path)) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO runs (name, artifacts_dir, config_hash, config_json, created_at, total_seconds) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    name,
+                    str(artifacts_dir.resolve()),
+                    config_hash(config),
+                    json.dumps(config, sort_keys=True, default=str),
+                    time.time(),
+                    sum(timings.values()),
+                ),
+            )
+            run_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO metrics (run_id, name, value) VALUES (?, ?, ?)",
+                [(run_id, key, float(value)) for key, value in metrics.items()],
+            )
+            conn.executemany(
+                "INSERT INTO artifacts (run_id, path, size_bytes) VALUES (?, ?, ?)",
+                [(run_id, path, size) for path, size in artifacts.items()],
+            )
+            conn.executemany(
+                "INSERT INTO timings (run_id, stage, seconds) VALUES (?, ?, ?)",
+                [(run_id, stage, seconds) for stage, seconds in timings.items()],
+            )
+        logger.info("Recorded run %d (%s) in registry %s", run_id, artifacts_dir, db_path)
+        return run_id
+    except sqlite3.Error as e:
+        logger.exception("Failed to record run.")
+        raise IOError(f"Could not record run in registry: {e}")
+
+
+def _fetch_metrics(conn: sqlite3.Connection, run_ids: List[int], chunk_size: int = 500) -> Dict[int, Dict[str, float]]:
+    """
+    Fetch the metrics of many runs with one query per chunk of run ids.
+
+    Args:
+        conn: Open registry connection.
+        run_ids: Runs to fetch metrics for.
+        chunk_size: Run ids per query, kept below SQLite's bound-parameter limit.
+
+    Returns:
+        Dict mapping run id to its metrics.
+    """
+    metrics: Dict[int, Dict[str, float]] = {}
+    for start in range(0, len(run_ids), chunk_size):
+        chunk = run_ids[start:start + chunk_size]
+        placeholders = ", ".join("?" * len(chunk))
+        for row in conn.execute(
+            f"SELECT run_id, name, value FROM metrics WHERE run_id IN ({placeholders})", chunk
+        ):
+            metrics.setdefault(row["run_id"], {})[row["name"]] = row["value"]
+    return metrics
+
+
+def query_runs(
+    db_path: Path,
+    sort_by: Optional[str] = None,
+    ascending: bool = False,
+    config_hash_prefix: Optional[str] = None,
+    name: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Look up runs, optionally filtered and ordered by a metric.
+
+    Args:
+        db_path: Path to the SQLite registry file.
+        sort_by: Metric name to order by; runs without it are excluded. Defaults to newest first.
+        ascending: Sort the metric ascending instead of descending.
+        config_hash_prefix: Only return runs whose config hash starts with this prefix.
+        name: Only return runs with this run name.
+        limit: Maximum number of runs to return.
+
+    Returns:
+        List of run dicts with their metrics attached.
+    """
+    clauses, params = [], []
+    if sort_by:
+        query = "SELECT r.*, m.value AS sort_value FROM runs r JOIN metrics m ON m.run_id = r.run_id AND m.name = ?"
+        params.append(sort_by)
+        order = f"m.value {'ASC' if ascending else 'DESC'}, r.created_at DESC, r.run_id DESC"
+    else:
+        query = "SELECT r.* FROM runs r"
+        order = "r.created_at DESC, r.run_id DESC"
+    if config_hash_prefix:
+        clauses.append("r.config_hash LIKE ?")
+        params.append(f"{config_hash_prefix}%")
+    if name:
+        clauses.append("r.name = ?")
+        params.append(name)
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += f" ORDER BY {order}"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(int(limit))
+
+    try:
+        with contextlib.closing(connect(db_path)) as conn:
+            runs = [dict(row) for row in conn.execute(query, params)]
+            metrics = _fetch_metrics(conn, [run["run_id"] for run in runs])
+            for run in runs:
+                run.pop("config_json", None)
+                run.pop("sort_value", None)
+                run["metrics"] = metrics.get(run["run_id"], {})
+        return runs
+    except sqlite3.Error as e:
+        logger.exception("Failed to query run registry.")
+        raise RuntimeError(f"Registry query failed: {e}")
+
+
+def get_run(db_path: Path, run_id: int) -> Dict[str, Any]:
+    """
+    Fetch one run with its config, metrics, artifacts and stage timings.
+
+    Args:
+        db_path: Path to the SQLite registry file.
+        run_id: Id of the run.
+
+    Returns:
+        Run dict.
+
+    Raises:
+        ValueError: If the run does not exist.
+    """
+    try:
+        with contextlib.closing(connect(db_path)) as conn:
+            row = conn.execute("SELECT * FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+            if row is None:
+                raise ValueError(f"No run with id {run_id}")
+            run = dict(row)
+            run["config"] = json.loads(run.pop("config_json"))
+            run["metrics"] = {
+                r["name"]: r["value"]
+                for r in conn.execute("SELECT name, value FROM metrics WHERE run_id = ?", (run_id,))
+            }
+            run["artifacts"] = {
+                r["path"]: r["size_bytes"]
+                for r in conn.execute("SELECT path, size_bytes FROM artifacts WHERE run_id = ?", (run_id,))
+            }
+            run["timings"] = {
+                r["stage"]: r["seconds"]
+                for r in conn.execute("SELECT stage, seconds FROM timings WHERE run_id = ?", (run_id,))
+            }
+        return run
+    except sqlite3.Error as e:
+        logger.exception("Failed to read run from registry.")
+        raise RuntimeError(f"Registry lookup failed: {e}")
+
+
+def best_run(db_path: Path, metric: str, ascending: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Return the run with the best value of a metric.
+
+    Args:
+        db_path: Path to the SQLite registry file.
+        metric: Metric name to rank by.
+        ascending: Treat lower values as better.
+
+    Returns:
+        Run dict, or None if no run has the metric.
+    """
+    runs = query_runs(db_path, sort_by=metric, ascending=ascending, limit=1)
+    return runs[0] if runs else None
+
+
+def prune_runs(
+    db_path: Path,
+    keep_last: Optional[int] = None,
+    keep_best: Optional[int] = None,
+    metric: Optional[str] = None,
+    ascending: bool = False,
+    max_age_days: Optional[float] = None,
+    delete_artifacts: bool = False,
+    dry_run: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Remove runs that fall outside a retention policy.
+
+    A run is kept if it is among the newest `keep_last` runs, among the
+    `keep_best` runs by `metric`, or younger than `max_age_days`. Every
+    other run is removed from the index and, optionally, from disk.
+
+    Args:
+        db_path: Path to the SQLite registry file.
+        keep_last: Number of most recent runs to keep.
+        keep_best: Number of best runs by `metric` to keep.
+        metric: Metric used for `keep_best` (higher is better unless `ascending`).
+        ascending: Treat lower values of `metric` as better.
+        max_age_days: Keep every run younger than this many days.
+        delete_artifacts: Also delete each pruned run's artifacts directory.
+        dry_run: Report what would be pruned without changing anything.
+
+    Returns:
+        List of pruned runs (id, name, artifacts_dir).
+    """
+    if keep_best and not metric:
+        raise ValueError("'metric' is required when 'keep_best' is set")
+    if keep_last is None and keep_best is None and max_age_days is None:
+        raise ValueError("At least one of keep_last, keep_best or max_age_days is required")
+
+    try:
+        with contextlib.closing(connect(db_path)) as conn, conn:
+            keep = set()
+            if keep_last:
+                keep.update(row[0] for row in conn.execute(
+                    "SELECT run_id FROM runs ORDER BY created_at DESC, run_id DESC LIMIT ?", (keep_last,)
+                ))
+            if keep_best:
+                keep.update(row[0] for row in conn.execute(
+                    f"SELECT run_id FROM metrics WHERE name = ? ORDER BY value {'ASC' if ascending else 'DESC'} LIMIT ?",
+                    (metric, keep_best),
+                ))
+            if max_age_days is not None:
+                cutoff = time.time() - max_age_days * 86400
+                keep.update(row[0] for row in conn.execute(
+                    "SELECT run_id FROM runs WHERE created_at >= ?", (cutoff,)
+                ))
+
+            pruned = [
+                dict(row)
+                for row in conn.execute("SELECT run_id, name, artifacts_dir FROM runs ORDER BY created_at")
+                if row["run_id"] not in keep
+            ]
+            if dry_run:
+                logger.info("Dry run: %d runs would be pruned.", len(pruned))
+                return pruned
+
+            conn.executemany("DELETE FROM runs WHERE run_id = ?", [(run["run_id"],) for run in pruned])
+
+        if delete_artifacts:
+            for run in pruned:
+                try:
+                    shutil.rmtree(run["artifacts_dir"])
+                except OSError as e:
+                    logger.warning("Could not delete artifacts of run %d at %s: %s",
+                                   run["run_id"], run["artifacts_dir"], e)
+        logger.info("Pruned %d runs from registry %s", len(pruned), db_path)
+        return pruned
+    except sqlite3.Error as e:
+        logger.exception("Failed to prune run registry.")
+        raise RuntimeError(f"Registry prune failed: {e}")
+
+
+def registry_path_from_config(config_path: Path) -> Path:
+    """
+    Read the registry location from a pipeline config.
+
+    Args:
+        config_path: Path to the pipeline YAML config.
+
+    Returns:
+        The config's 'registry.path', or 'runs/registry.db' if it is not set.
+    """
+    try:
+        with open(config_path, "r") as f:
+            config = yaml.safe_load(f) or {}
+        return Path(config.get("registry", {}).get("path", "runs/registry.db"))
+    except (OSError, yaml.YAMLError) as e:
+        logger.error("Failed to read config %s: %s", config_path, e)
+        raise ValueError(f"Could not read registry path from {config_path}: {e}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Command line interface for querying and pruning the run registry.
+
+    Args:
+        argv: Argument list (default: sys.argv).
+    """
+    parser = argparse.ArgumentParser(description="Query and prune the pipeline run registry")
+    parser.add_argument("--config", default="config/default-config.yaml",
+                        help="Pipeline config whose 'registry.path' locates the database")
+    parser.add_argument("--db", help="Path to the registry database (overrides --config)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = sub.add_parser("list", help="List runs")
+    list_parser.add_argument("--sort-by", help="Metric to order by (descending)")
+    list_parser.add_argument("--ascending", action="store_true", help="Sort the metric ascending")
+    list_parser.add_argument("--config-hash", help="Filter by config hash prefix")
+    list_parser.add_argument("--name", help="Filter by run name")
+    list_parser.add_argument("--limit", type=int, default=20, help="Maximum runs to show")
+
+    best_parser = sub.add_parser("best", help="Show the best run by a metric")
+    best_parser.add_argument("metric", help="Metric to rank by")
+    best_parser.add_argument("--ascending", action="store_true", help="Treat lower values as better")
+
+    show_parser = sub.add_parser("show", help="Show one run in full")
+    show_parser.add_argument("run_id", type=int, help="Run id")
+
+    prune_parser = sub.add_parser("prune", help="Prune runs outside a retention policy")
+    prune_parser.add_argument("--keep-last", type=int, help="Keep the N most recent runs")
+    prune_parser.add_argument("--keep-best", type=int, help="Keep the N best runs by --metric")
+    prune_parser.add_argument("--metric", help="Metric for --keep-best")
+    prune_parser.add_argument("--ascending", action="store_true", help="Treat lower --metric values as better")
+    prune_parser.add_argument("--max-age-days", type=float, help="Keep runs younger than this")
+    prune_parser.add_argument("--delete-artifacts", action="store_true", help="Delete pruned run directories")
+    prune_parser.add_argument("--dry-run", action="store_true", help="Only report what would be pruned")
+
+    args = parser.parse_args(argv)
+    db_path = Path(args.db) if args.db else registry_path_from_config(Path(args.config))
+
+    if args.command == "list":
+        result = query_runs(
+            db_path,
+            sort_by=args.sort_by,
+            ascending=args.ascending,
+            config_hash_prefix=args.config_hash,
+            name=args.name,
+            limit=args.limit,
+        )
+    elif args.command == "best":
+        result = best_run(db_path, args.metric, ascending=args.ascending)
+    elif args.command == "show":
+        result = get_run(db_path, args.run_id)
+    else:
+        result = prune_runs(
+            db_path,
+            keep_last=args.keep_last,
+            keep_best=args.keep_best,
+            metric=args.metric,
+            ascending=args.ascending,
+            max_age_days=args.max_age_days,
+            delete_artifacts=args.delete_artifacts,
+            dry_run=args.dry_run,
+        )
+    print(json.dumps(result, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
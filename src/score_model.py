@@ -1,12 +1,33 @@
+import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
 # Logging Configuration
 logger = logging.getLogger("model_scorer")
 
-def score_model(test_df: pd.DataFrame, model: Any, config: Dict[str, Any]) -> pd.DataFrame:
+def model_input(model: Any, X: np.ndarray) -> Any:
+    """
+    Label a matrix with the model's feature names, if it was fitted with any.
+
+    The DataFrame wraps X without copying it, so batches keep their memory
+    footprint while avoiding sklearn's missing feature names warning.
+
+    Args:
+        model: Trained model object.
+        X: Feature matrix (or batch of rows) in the model's column order.
+
+    Returns:
+        X as a DataFrame with the model's 'feature_names_in_', or X unchanged.
+    """
+    names = getattr(model, "feature_names_in_", None)
+    return X if names is None else pd.DataFrame(X, columns=names, copy=False)
+
+
+def score_model(test_df: pd.DataFrame, model: Any, config: Dict[str, Any],
+                threshold: Optional[float] = None) -> pd.DataFrame:
     """
     Score the model using test data.
 
@@ -14,6 +35,7 @@ def score_model(test_df: pd.DataFrame, model: Any, config: Dict[str, Any]) -> pd
         test_df: Test dataset with features and target.
         model: Trained model object.
         config: Dict with 'target_column' key.
+        threshold: Positive-class probability cutoff for 'y_pred' (default: the model's own prediction).
 
     Returns:
         DataFrame with true labels, predictions, and probabilities.
@@ -22,14 +44,19 @@ def score_model(test_df: pd.DataFrame, model: Any, config: Dict[str, Any]) -> pd
         logger.info("Scoring the model.")
         X_test = test_df.drop(columns=[config["target_column"]])
         y_test = test_df[config["target_column"]]
-        y_pred = model.predict(X_test)
-
         y_proba = (
             model.predict_proba(X_test)[:, 1]
             if hasattr(model, "predict_proba")
             else None
         )
 
+        if threshold is not None:
+            if y_proba is None:
+                raise ValueError("A threshold requires a model with predict_proba")
+            y_pred = model.classes_[(y_proba >= threshold).astype(int)]
+        else:
+            y_pred = model.predict(X_test)
+
         scores = pd.DataFrame({
             "y_true": y_test,
             "y_pred": y_pred,
@@ -47,6 +74,98 @@ def score_model(test_df: pd.DataFrame, model: Any, config: Dict[str, Any]) -> pd
         raise RuntimeError(f"Scoring failed: {e}")
 
 
+def score_indices(X: np.ndarray, y: np.ndarray, test_idx: np.ndarray, model: Any,
+                  config: Dict[str, Any], threshold: Optional[float] = None) -> pd.DataFrame:
+    """
+    Score the model on the test rows of a shared feature matrix.
+
+    Test rows are gathered in batches of 'batch_size' so the full test set is
+    never materialized as a separate copy.
+
+    Args:
+        X: Shared feature matrix.
+        y: Target vector.
+        test_idx: Row positions to score.
+        model: Trained model object.
+        config: Dict with optional 'batch_size' key.
+        threshold: Positive-class probability cutoff for 'y_pred' (default: the model's own prediction).
+
+    Returns:
+        DataFrame with true labels, predictions, and probabilities.
+    """
+    try:
+        logger.info("Scoring the model on %d rows.", len(test_idx))
+        batch_size = config.get("batch_size", 65536)
+        has_proba = hasattr(model, "predict_proba")
+        if threshold is not None and not has_proba:
+            raise ValueError("A threshold requires a model with predict_proba")
+        y_pred = np.empty(len(test_idx), dtype=y.dtype)
+        y_proba = np.empty(len(test_idx), dtype=np.float64) if has_proba else None
+
+        for start in range(0, len(test_idx), batch_size):
+            batch = model_input(model, X[test_idx[start:start + batch_size]])
+            if has_proba:
+                proba = model.predict_proba(batch)
+                predicted = proba[:, 1] >= threshold if threshold is not None else proba.argmax(axis=1)
+                y_pred[start:start + len(batch)] = model.classes_[predicted.astype(int)]
+                y_proba[start:start + len(batch)] = proba[:, 1]
+            else:
+                y_pred[start:start + len(batch)] = model.predict(batch)
+
+        scores = pd.DataFrame({
+            "y_true": y[test_idx],
+            "y_pred": y_pred,
+            "y_proba": y_proba
+        })
+
+        logger.info("Scoring completed successfully.")
+        return scores
+
+    except Exception as e:
+        logger.exception("Error during model scoring.")
+        raise RuntimeError(f"Scoring failed: {e}")
+
+
+def load_threshold(path: Path, model_type: Optional[str] = None,
+                   run_dir: Optional[Path] = None) -> float:
+    """
+    Load a saved operating point threshold.
+
+    A threshold is only meaningful for the model it was tuned on, so when
+    `model_type` or `run_dir` is given it must match the one recorded in the file.
+
+    Args:
+        path: JSON file written by the evaluation stage, with a 'threshold' key.
+        model_type: Expected 'model_type' of the operating point.
+        run_dir: Expected run directory of the operating point.
+
+    Returns:
+        Positive-class probability cutoff.
+    """
+    try:
+        with open(path, "r") as f:
+            operating_point = json.load(f)
+        threshold = float(operating_point["threshold"])
+    except Exception as e:
+        logger.exception("Failed to load threshold.")
+        raise IOError(f"Could not load threshold: {e}")
+
+    expected = {
+        "model_type": model_type,
+        "run_dir": str(Path(run_dir).resolve()) if run_dir is not None else None,
+    }
+    for key, value in expected.items():
+        if value is None:
+            continue
+        if key not in operating_point:
+            logger.warning("Threshold file %s does not record '%s'; cannot check it is %s.", path, key, value)
+        elif operating_point[key] != value:
+            raise ValueError(f"Threshold in {path} was tuned for {key} {operating_point[key]}, not {value}")
+
+    logger.info("Loaded threshold %.4f from %s", threshold, path)
+    return threshold
+
+
 def save_scores(df: pd.DataFrame, path: Path) -> None:
     """
     Save scores DataFrame to CSV.
@@ -1,9 +1,12 @@
 from pathlib import Path
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, List, Optional, Type
 import logging
+import time
+import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
 from sklearn.base import ClassifierMixin
 import joblib
 
@@ -11,13 +14,52 @@ import joblib
 # Logging Configuration
 logger = logging.getLogger("model_trainer")
 
+# Model backends selectable through the 'type' key of the model config
+MODEL_BACKENDS: Dict[str, Type[ClassifierMixin]] = {
+    "RandomForestClassifier": RandomForestClassifier,
+    "HistGradientBoostingClassifier": HistGradientBoostingClassifier,
+}
+
+
+def register_backend(name: str, estimator: Type[ClassifierMixin]) -> None:
+    """
+    Register a classifier class as a model backend.
+
+    Args:
+        name: Value of the 'type' config key that selects the backend.
+        estimator: Scikit-learn compatible classifier class.
+    """
+    MODEL_BACKENDS[name] = estimator
+    logger.debug("Registered model backend %s", name)
+
+
+def build_model(config: Dict[str, Any]) -> ClassifierMixin:
+    """
+    Instantiate the model backend named by 'type' with the configured 'params'.
+
+    Args:
+        config: Dict with optional 'type' (default: RandomForestClassifier) and 'params'.
+
+    Returns:
+        Unfitted classifier.
+
+    Raises:
+        ValueError: If 'type' is not a registered backend.
+    """
+    model_type = config.get("type", "RandomForestClassifier")
+    if model_type not in MODEL_BACKENDS:
+        raise ValueError(f"Unknown model type: {model_type} (available: {', '.join(MODEL_BACKENDS)})")
+    logger.debug("Initializing %s model.", model_type)
+    return MODEL_BACKENDS[model_type](**config.get("params", {}))
+
+
 def train_model(df: pd.DataFrame, config: Dict[str, Any]) -> Tuple[ClassifierMixin, pd.DataFrame, pd.DataFrame]:
     """
-    Train a RandomForestClassifier using provided data and config.
+    Train the classifier selected by 'type' using provided data and config.
 
     Args:
         df: Dataset containing features and target.
-        config: Dict with 'target_column', 'test_size', and model 'params'.
+        config: Dict with 'target_column', 'test_size', model 'type' and 'params'.
 
     Returns:
         Tuple of (trained model, train DataFrame, test DataFrame).
@@ -35,8 +77,7 @@ def train_model(df: pd.DataFrame, config: Dict[str, Any]) -> Tuple[ClassifierMix
             random_state=config["params"].get("random_state", 42),
         )
 
-        logger.debug("Initializing model.")
-        model = RandomForestClassifier(**config["params"])
+        model = build_model(config)
         model.fit(X_train, y_train)
         logger.info("Model training done.")
 
@@ -53,6 +94,248 @@ def train_model(df: pd.DataFrame, config: Dict[str, Any]) -> Tuple[ClassifierMix
         raise RuntimeError(f"Training failed: {e}")
 
 
+def to_matrix(df: pd.DataFrame, target_column: str) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    Build the shared feature matrix and target vector used by index-based splitting.
+
+    The matrix is allocated once and filled column by column, so no intermediate
+    DataFrame copy is made. float32 matches the precision tree models train on.
+
+    Args:
+        df: Dataset containing features and target.
+        target_column: Name of the target column.
+
+    Returns:
+        Tuple of (feature matrix, target vector, feature names).
+    """
+    try:
+        feature_names = [col for col in df.columns if col != target_column]
+        X = np.empty((len(df), len(feature_names)), dtype=np.float32)
+        for j, col in enumerate(feature_names):
+            X[:, j] = df[col].to_numpy()
+        y = df[target_column].to_numpy()
+        logger.info("Built feature matrix with shape %s", X.shape)
+        return X, y, feature_names
+    except KeyError as e:
+        logger.error("Missing target column: %s", e)
+        raise ValueError(f"Missing target column: {e}")
+
+
+def split_indices(y: np.ndarray, config: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split row positions into train and test index arrays without copying any data.
+
+    Args:
+        y: Target vector, used for stratification.
+        config: Dict with 'test_size', model 'params' and optional 'split' settings.
+
+    Returns:
+        Tuple of (sorted train indices, sorted test indices).
+    """
+    try:
+        stratify = y if config.get("split", {}).get("stratify", False) else None
+        train_idx, test_idx = train_test_split(
+            np.arange(len(y)),
+            test_size=config["test_size"],
+            random_state=config["params"].get("random_state", 42),
+            stratify=stratify,
+        )
+        logger.debug("Split %d train / %d test rows.", len(train_idx), len(test_idx))
+        return np.sort(train_idx), np.sort(test_idx)
+    except KeyError as e:
+        logger.error("Missing config key: %s", e)
+        raise ValueError(f"Missing config key: {e}")
+
+
+def fit_model(X: np.ndarray, y: np.ndarray, train_idx: np.ndarray, config: Dict[str, Any],
+              feature_names: Optional[List[str]] = None) -> ClassifierMixin:
+    """
+    Train the classifier selected by 'type' on the training rows of a shared feature matrix.
+
+    Args:
+        X: Shared feature matrix.
+        y: Target vector.
+        train_idx: Row positions to train on.
+        config: Dict with model 'type' and 'params'.
+        feature_names: Column names of X, recorded as the model's 'feature_names_in_'.
+
+    Returns:
+        Trained model.
+    """
+    try:
+        logger.info("Starting model training on %d rows...", len(train_idx))
+        model = build_model(config)
+        model.fit(X[train_idx], y[train_idx])
+        if feature_names is not None:
+            model.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        logger.info("Model training done.")
+        return model
+    except KeyError as e:
+        logger.error("Missing config key: %s", e)
+        raise ValueError(f"Missing config key: {e}")
+    except Exception as e:
+        logger.exception("Error during training.")
+        raise RuntimeError(f"Training failed: {e}")
+
+
+def grow_forest(X: np.ndarray, y: np.ndarray, train_idx: np.ndarray, config: Dict[str, Any],
+                feature_names: Optional[List[str]] = None) -> Tuple[ClassifierMixin, pd.DataFrame]:
+    """
+    Grow a RandomForestClassifier in increments until the out-of-bag score stops improving.
+
+    Trees are added 'step' at a time with warm starting. After each increment the
+    OOB score and the prediction latency on up to 'latency_rows' training rows are
+    recorded. Growth stops once the OOB gain stays below 'tol' for 'patience'
+    increments (or 'max_estimators' is reached), and the forest is truncated to the
+    smallest size whose OOB score is within 'tol' of the best one seen.
+
+    Args:
+        X: Shared feature matrix.
+        y: Target vector.
+        train_idx: Row positions to train on.
+        config: Dict with model 'params' and 'auto_size' settings.
+        feature_names: Column names of X, recorded as the model's 'feature_names_in_'.
+
+    Returns:
+        Tuple of (trained model, growth curve DataFrame).
+    """
+    try:
+        auto = config["auto_size"]
+        step = auto.get("step", 10)
+        max_estimators = auto.get("max_estimators", 300)
+        tol = auto.get("tol", 0.001)
+        patience = auto.get("patience", 2)
+
+        params = {**config["params"], "oob_score": True, "warm_start": True}
+        params.pop("n_estimators", None)
+        model = RandomForestClassifier(n_estimators=auto.get("start", step), **params)
+
+        X_train, y_train = X[train_idx], y[train_idx]
+        X_latency = X_train[:auto.get("latency_rows", 1000)]
+
+        logger.info("Growing forest on %d rows (step %d, max %d trees).", len(train_idx), step, max_estimators)
+        curve, best, stale, fit_seconds = [], -np.inf, 0, 0.0
+        while True:
+            start = time.perf_counter()
+            model.fit(X_train, y_train)
+            fit_seconds += time.perf_counter() - start
+
+            start = time.perf_counter()
+            model.predict_proba(X_latency)
+            latency = (time.perf_counter() - start) * 1000 / len(X_latency) * 1000
+
+            curve.append({
+                "n_estimators": model.n_estimators,
+                "oob_score": model.oob_score_,
+                "fit_seconds": fit_seconds,
+                "predict_ms_per_1k_rows": latency,
+            })
+            logger.debug("%d trees: OOB score %.4f", model.n_estimators, model.oob_score_)
+
+            stale = stale + 1 if model.oob_score_ - best < tol else 0
+            best = max(best, model.oob_score_)
+            if stale >= patience or model.n_estimators + step > max_estimators:
+                break
+            model.n_estimators += step
+
+        curve = pd.DataFrame(curve)
+        selected = curve[curve["oob_score"] >= best - tol].iloc[0]
+        n_selected = int(selected["n_estimators"])
+        model.estimators_ = model.estimators_[:n_selected]
+        model.n_estimators = n_selected
+        model.oob_score_ = selected["oob_score"]
+        model.warm_start = False
+        if hasattr(model, "oob_decision_function_"):
+            del model.oob_decision_function_
+        if feature_names is not None:
+            model.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        curve["selected"] = curve["n_estimators"] == n_selected
+
+        logger.info("Selected %d trees (OOB score %.4f, best %.4f).", n_selected, selected["oob_score"], best)
+        return model, curve
+
+    except KeyError as e:
+        logger.error("Missing config key: %s", e)
+        raise ValueError(f"Missing config key: {e}")
+    except Exception as e:
+        logger.exception("Error during forest growth.")
+        raise RuntimeError(f"Training failed: {e}")
+
+
+def save_growth_curve(curve: pd.DataFrame, out_dir: Path) -> None:
+    """
+    Save the forest growth curve as CSV and an OOB-score-versus-latency chart.
+
+    Args:
+        curve: Growth curve from `grow_forest`.
+        out_dir: Directory to save 'forest_growth.csv' and 'forest_growth.png' to.
+    """
+    try:
+        logger.info("Saving forest growth curve to %s", out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        curve.to_csv(out_dir / "forest_growth.csv", index=False)
+
+        fig, ax = plt.subplots()
+        ax.plot(curve["predict_ms_per_1k_rows"], curve["oob_score"], marker="o")
+        for _, row in curve.iterrows():
+            ax.annotate(int(row["n_estimators"]), (row["predict_ms_per_1k_rows"], row["oob_score"]), fontsize=8)
+        selected = curve[curve["selected"]]
+        ax.scatter(selected["predict_ms_per_1k_rows"], selected["oob_score"], color="red", zorder=3, label="Selected")
+        ax.set_xlabel("Predict latency (ms per 1k rows)")
+        ax.set_ylabel("OOB score")
+        ax.set_title("Forest Size: OOB Score vs Latency")
+        ax.legend()
+        fig.tight_layout()
+        fig.savefig(out_dir / "forest_growth.png")
+        plt.close(fig)
+        logger.info("Forest growth curve saved.")
+    except Exception as e:
+        logger.exception("Saving forest growth curve failed.")
+        raise IOError(f"Save error: {e}")
+
+
+def save_split(train_idx: np.ndarray, test_idx: np.ndarray, out_dir: Path,
+               row_ids: Optional[np.ndarray] = None) -> None:
+    """
+    Save the train/test split as index arrays instead of duplicate CSVs.
+
+    Args:
+        train_idx: Train row positions.
+        test_idx: Test row positions.
+        out_dir: Directory to save 'split.npz' to.
+        row_ids: Original row labels; when given, these are stored instead of positions
+            so the split maps back to rows of the saved datasets.
+    """
+    try:
+        logger.info("Saving split indices to %s", out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        if row_ids is not None:
+            train_idx, test_idx = row_ids[train_idx], row_ids[test_idx]
+        np.savez_compressed(out_dir / "split.npz", train_idx=train_idx, test_idx=test_idx)
+        logger.info("Split indices saved.")
+    except Exception as e:
+        logger.exception("Saving split failed.")
+        raise IOError(f"Save error: {e}")
+
+
+def load_split(path: Path) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Load a train/test split saved by `save_split`.
+
+    Args:
+        path: Path to 'split.npz'.
+
+    Returns:
+        Tuple of (train indices, test indices).
+    """
+    try:
+        with np.load(path) as split:
+            return split["train_idx"], split["test_idx"]
+    except Exception as e:
+        logger.exception("Loading split failed.")
+        raise IOError(f"Load error: {e}")
+
+
 def save_data(train: pd.DataFrame, test: pd.DataFrame, out_dir: Path) -> None:
     """
     Save train and test DataFrames to CSV files.
@@ -0,0 +1,33 @@
+import pytest
+import numpy as np
+from src.benchmark_models import benchmark_models
+
+# ---------- Model Benchmark Tests ----------
+
+def _split():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 3)).astype(np.float32)
+    y = (X[:, 0] > 0).astype(int)
+    return X, y, np.arange(200), np.arange(200, 300)
+
+def test_benchmark_models_one_row_per_backend():
+    X, y, train_idx, test_idx = _split()
+    backends = {
+        "RandomForestClassifier": {"n_estimators": 10, "random_state": 0},
+        "HistGradientBoostingClassifier": {"max_iter": 10, "random_state": 0},
+    }
+    results = benchmark_models(X, y, train_idx, test_idx, {"batch_size": 32}, {"backends": backends},
+                               {"metrics": ["accuracy", "f1", "roc_auc"]})
+    assert list(results["model"]) == list(backends)
+    for column in ("fit_seconds", "predict_seconds", "predict_ms_per_1k_rows", "accuracy", "f1", "roc_auc"):
+        assert (results[column] > 0).all()
+
+def test_benchmark_models_unknown_backend():
+    X, y, train_idx, test_idx = _split()
+    with pytest.raises(RuntimeError):
+        benchmark_models(X, y, train_idx, test_idx, {}, {"backends": {"NotAModel": {}}}, {"metrics": ["accuracy"]})
+
+def test_benchmark_models_missing_backends():
+    X, y, train_idx, test_idx = _split()
+    with pytest.raises(ValueError):
+        benchmark_models(X, y, train_idx, test_idx, {}, {}, {"metrics": ["accuracy"]})
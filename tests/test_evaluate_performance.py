@@ -0,0 +1,36 @@
+import pytest
+import numpy as np
+from sklearn.metrics import average_precision_score, f1_score, roc_auc_score, roc_curve
+from src.evaluate_performance import threshold_sweep, sweep_auc, optimal_threshold
+
+# ---------- Threshold Sweep Tests ----------
+
+def test_threshold_sweep_matches_sklearn():
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 2, size=500)
+    y_score = np.round(rng.random(500) * 0.7 + y_true * 0.3, 2)  # rounded to force ties
+    sweep = threshold_sweep(y_true, y_score)
+
+    fpr, tpr, _ = roc_curve(y_true, y_score, drop_intermediate=False)
+    np.testing.assert_allclose(sweep["fpr"], fpr)
+    np.testing.assert_allclose(sweep["tpr"], tpr)
+
+    aucs = sweep_auc(sweep)
+    assert np.isclose(aucs["roc_auc"], roc_auc_score(y_true, y_score))
+    assert np.isclose(aucs["average_precision"], average_precision_score(y_true, y_score))
+
+    for _, row in sweep.iloc[1::25].iterrows():
+        y_pred = (y_score >= row["threshold"]).astype(int)
+        assert np.isclose(row["f1"], f1_score(y_true, y_pred))
+        assert np.isclose(row["f1_macro"], f1_score(y_true, y_pred, average="macro"))
+
+def test_optimal_threshold_happy():
+    sweep = threshold_sweep(np.array([0, 0, 1, 1]), np.array([0.1, 0.4, 0.35, 0.8]))
+    point = optimal_threshold(sweep, "accuracy")
+    assert point["threshold"] == 0.8
+    assert point["accuracy"] == 0.75
+
+def test_optimal_threshold_unknown_objective():
+    sweep = threshold_sweep(np.array([0, 1]), np.array([0.2, 0.9]))
+    with pytest.raises(ValueError):
+        optimal_threshold(sweep, "not_a_metric")
@@ -0,0 +1,60 @@
+import pytest
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+import src.feature_importance as fi
+from src.feature_importance import permutation_importance
+
+# ---------- Permutation Importance Tests ----------
+
+def _fit():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 3)).astype(np.float32)
+    y = (X[:, 1] > 0).astype(int)
+    model = RandomForestClassifier(n_estimators=20, random_state=0).fit(X[:300], y[:300])
+    return X[300:], y[300:], model
+
+def test_permutation_importance_ranks_informative_feature():
+    X_eval, y_eval, model = _fit()
+    X_before = X_eval.copy()
+    config = {"metric": "accuracy", "n_repeats": 4, "n_jobs": 1, "max_batch_rows": 250}
+    importance = permutation_importance(X_eval, y_eval, model, ["a", "b", "c"], config)
+    assert importance["feature"].iloc[0] == "b"
+    assert importance["importance_mean"].iloc[0] > 0.3
+    np.testing.assert_array_equal(X_eval, X_before)
+
+    parallel = permutation_importance(X_eval, y_eval, model, ["a", "b", "c"], {**config, "n_jobs": 2})
+    np.testing.assert_allclose(parallel["importance_mean"], importance["importance_mean"])
+
+def test_permutation_importance_chunks_rows_over_cap():
+    X_eval, y_eval, model = _fit()
+    config = {"metric": "roc_auc", "n_repeats": 3, "n_jobs": 1, "max_batch_rows": 1000}
+    batched = permutation_importance(X_eval, y_eval, model, ["a", "b", "c"], config)
+    for n_jobs in (1, 2):
+        chunked = permutation_importance(X_eval, y_eval, model, ["a", "b", "c"],
+                                         {**config, "n_jobs": n_jobs, "max_batch_rows": 30})
+        np.testing.assert_allclose(chunked["importance_mean"], batched["importance_mean"])
+
+def test_permutation_importance_unknown_metric():
+    X_eval, y_eval, model = _fit()
+    with pytest.raises(RuntimeError):
+        permutation_importance(X_eval, y_eval, model, ["a", "b", "c"], {"metric": "nope", "n_jobs": 1})
+
+def test_permutation_importance_clears_state_on_failure(monkeypatch):
+    X_eval, y_eval, model = _fit()
+    def fail(feature, seed):
+        raise MemoryError("boom")
+    monkeypatch.setattr(fi, "_permute_feature", fail)
+    with pytest.raises(RuntimeError):
+        permutation_importance(X_eval, y_eval, model, ["a", "b", "c"], {"n_jobs": 1})
+    assert not fi._worker_state
+
+def test_permutation_importance_selects_rows():
+    X_eval, y_eval, model = _fit()
+    X = np.vstack([np.zeros((50, 3), dtype=np.float32), X_eval])
+    y = np.concatenate([np.zeros(50, dtype=int), y_eval])
+    config = {"metric": "roc_auc", "n_repeats": 3, "n_jobs": 1}
+    expected = permutation_importance(X_eval, y_eval, model, ["a", "b", "c"], config)
+    for n_jobs in (1, 2):
+        selected = permutation_importance(X, y, model, ["a", "b", "c"], {**config, "n_jobs": n_jobs},
+                                          rows=np.arange(50, len(X)))
+        np.testing.assert_allclose(selected["importance_mean"], expected["importance_mean"])
@@ -0,0 +1,76 @@
+import pytest
+from src.run_registry import record_run, query_runs, best_run, get_run, prune_runs, config_hash, main
+
+# ---------- Record / Query Tests ----------
+
+def _record(db, tmp_path, name, auc):
+    run_dir = tmp_path / name
+    run_dir.mkdir()
+    (run_dir / "scores.csv").write_text("y_true,y_pred\n1,1\n")
+    return record_run(
+        db, name="pipeline", artifacts_dir=run_dir, config={"model": {"n": auc}},
+        metrics={"roc_auc": auc}, timings={"train_model": 1.5},
+    )
+
+def test_record_and_best_run(tmp_path):
+    db = tmp_path / "registry.db"
+    _record(db, tmp_path, "run_a", 0.8)
+    best_id = _record(db, tmp_path, "run_b", 0.9)
+    _record(db, tmp_path, "run_c", 0.7)
+
+    assert best_run(db, "roc_auc")["run_id"] == best_id
+    assert [r["metrics"]["roc_auc"] for r in query_runs(db, sort_by="roc_auc")] == [0.9, 0.8, 0.7]
+
+    run = get_run(db, best_id)
+    assert run["timings"] == {"train_model": 1.5}
+    assert run["config_hash"] == config_hash({"model": {"n": 0.9}})
+    assert list(run["artifacts"].values()) == [len("y_true,y_pred\n1,1\n")]
+
+def test_get_run_missing(tmp_path):
+    with pytest.raises(ValueError):
+        get_run(tmp_path / "registry.db", 1)
+
+# ---------- Prune Tests ----------
+
+def test_prune_keeps_best_and_last(tmp_path):
+    db = tmp_path / "registry.db"
+    _record(db, tmp_path, "run_a", 0.95)
+    _record(db, tmp_path, "run_b", 0.5)
+    _record(db, tmp_path, "run_c", 0.6)
+
+    pruned = prune_runs(db, keep_last=1, keep_best=1, metric="roc_auc", delete_artifacts=True)
+    assert [p["artifacts_dir"] for p in pruned] == [str((tmp_path / "run_b").resolve())]
+    assert not (tmp_path / "run_b").exists()
+    assert len(query_runs(db)) == 2
+
+def test_prune_deletes_relative_run_dir_from_other_cwd(tmp_path, monkeypatch):
+    db = tmp_path / "registry.db"
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "runs" / "old").mkdir(parents=True)
+    record_run(db, name="pipeline", artifacts_dir=tmp_path.joinpath("runs", "old").relative_to(tmp_path),
+               config={}, metrics={}, timings={})
+
+    monkeypatch.chdir(tmp_path / "runs")
+    prune_runs(db, max_age_days=-1, delete_artifacts=True)
+    assert not (tmp_path / "runs" / "old").exists()
+
+def test_prune_keep_best_ascending(tmp_path):
+    db = tmp_path / "registry.db"
+    _record(db, tmp_path, "run_a", 0.1)
+    _record(db, tmp_path, "run_b", 0.9)
+
+    pruned = prune_runs(db, keep_best=1, metric="roc_auc", ascending=True, dry_run=True)
+    assert [p["artifacts_dir"] for p in pruned] == [str((tmp_path / "run_b").resolve())]
+
+def test_cli_reads_registry_path_from_config(tmp_path, capsys):
+    db = tmp_path / "custom.db"
+    _record(db, tmp_path, "run_a", 0.8)
+    config = tmp_path / "config.yaml"
+    config.write_text(f"registry:\n  path: {db}\n")
+
+    main(["--config", str(config), "best", "roc_auc"])
+    assert '"roc_auc": 0.8' in capsys.readouterr().out
+
+def test_prune_requires_policy(tmp_path):
+    with pytest.raises(ValueError):
+        prune_runs(tmp_path / "registry.db")
@@ -0,0 +1,66 @@
+import json
+import warnings
+import pytest
+import numpy as np
+import pandas as pd
+from src.train_model import to_matrix, split_indices, fit_model
+from src.score_model import score_model, score_indices, load_threshold
+
+# ---------- Index Scoring Tests ----------
+
+def _fit_named():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(400, 3)), columns=["a", "b", "c"])
+    df["cloud_type"] = (df["b"] > 0).astype(int)
+    X, y, names = to_matrix(df, "cloud_type")
+    config = {"type": "RandomForestClassifier", "test_size": 0.25,
+              "params": {"n_estimators": 10, "random_state": 0}, "target_column": "cloud_type"}
+    train_idx, test_idx = split_indices(y, config)
+    model = fit_model(X, y, train_idx, config, names)
+    test_df = pd.DataFrame(X[test_idx], columns=names).assign(cloud_type=y[test_idx])
+    return X, y, test_idx, model, test_df, config
+
+def test_fit_model_records_feature_names():
+    _, _, _, model, _, _ = _fit_named()
+    assert list(model.feature_names_in_) == ["a", "b", "c"]
+
+def test_score_indices_matches_score_model():
+    X, y, test_idx, model, test_df, config = _fit_named()
+    assert len(test_idx) % 7 != 0
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        batched = score_indices(X, y, test_idx, model, {**config, "batch_size": 7})
+    framed = score_model(test_df, model, config)
+    np.testing.assert_array_equal(batched["y_true"], framed["y_true"])
+    np.testing.assert_array_equal(batched["y_pred"], framed["y_pred"])
+    np.testing.assert_allclose(batched["y_proba"], framed["y_proba"])
+
+def test_score_indices_out_of_range():
+    X, y, test_idx, model, _, config = _fit_named()
+    with pytest.raises(RuntimeError):
+        score_indices(X, y, np.array([len(X)]), model, config)
+
+# ---------- Threshold Tests ----------
+
+def test_threshold_sets_cutoff():
+    X, y, test_idx, model, test_df, config = _fit_named()
+    for threshold, expected in ((0.0, 1), (1.01, 0)):
+        batched = score_indices(X, y, test_idx, model, {**config, "batch_size": 7}, threshold=threshold)
+        framed = score_model(test_df, model, config, threshold=threshold)
+        assert (batched["y_pred"] == expected).all()
+        assert (framed["y_pred"] == expected).all()
+
+    proba = model.predict_proba(test_df.drop(columns=["cloud_type"]))[:, 1]
+    expected = (proba >= 0.7).astype(int)
+    np.testing.assert_array_equal(score_indices(X, y, test_idx, model, config, threshold=0.7)["y_pred"], expected)
+    np.testing.assert_array_equal(score_model(test_df, model, config, threshold=0.7)["y_pred"], expected)
+
+def test_load_threshold_checks_model(tmp_path):
+    path = tmp_path / "threshold.json"
+    path.write_text(json.dumps({"threshold": 0.3, "model_type": "RandomForestClassifier",
+                                "run_dir": str(tmp_path.resolve())}))
+    assert load_threshold(path, model_type="RandomForestClassifier", run_dir=tmp_path) == 0.3
+    with pytest.raises(ValueError):
+        load_threshold(path, model_type="HistGradientBoostingClassifier")
+    with pytest.raises(ValueError):
+        load_threshold(path, run_dir=tmp_path / "other")
@@ -0,0 +1,71 @@
+import pytest
+import pandas as pd
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingClassifier
+from src.train_model import to_matrix, split_indices, save_split, load_split, grow_forest, build_model
+
+# ---------- Feature Matrix Tests ----------
+
+def test_to_matrix_happy():
+    df = pd.DataFrame({"a": [1.0, 2.0], "cloud_type": [0, 1], "b": [3.0, 4.0]})
+    X, y, names = to_matrix(df, "cloud_type")
+    assert names == ["a", "b"]
+    assert X.dtype == np.float32
+    np.testing.assert_array_equal(X, [[1.0, 3.0], [2.0, 4.0]])
+    np.testing.assert_array_equal(y, [0, 1])
+
+def test_to_matrix_missing_target():
+    df = pd.DataFrame({"a": [1.0, 2.0]})
+    with pytest.raises(ValueError):
+        to_matrix(df, "cloud_type")
+
+# ---------- Index Split Tests ----------
+
+def test_split_indices_stratified(tmp_path):
+    y = np.array([0] * 80 + [1] * 20)
+    config = {"test_size": 0.25, "params": {"random_state": 0}, "split": {"stratify": True}}
+    train_idx, test_idx = split_indices(y, config)
+    assert len(np.intersect1d(train_idx, test_idx)) == 0
+    assert len(train_idx) + len(test_idx) == len(y)
+    assert y[test_idx].sum() == 5
+
+    save_split(train_idx, test_idx, tmp_path)
+    loaded_train, loaded_test = load_split(tmp_path / "split.npz")
+    np.testing.assert_array_equal(loaded_train, train_idx)
+    np.testing.assert_array_equal(loaded_test, test_idx)
+
+def test_split_indices_missing_test_size():
+    with pytest.raises(ValueError):
+        split_indices(np.zeros(10), {"params": {}})
+
+# ---------- Forest Growth Tests ----------
+
+def test_grow_forest_selects_smallest_within_tol():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 3)).astype(np.float32)
+    y = (X[:, 0] > 0).astype(int)
+    config = {
+        "params": {"n_estimators": 500, "random_state": 0},
+        "auto_size": {"start": 5, "step": 5, "max_estimators": 40, "tol": 0.01, "patience": 2},
+    }
+    model, curve = grow_forest(X, y, np.arange(300), config)
+    assert curve["n_estimators"].max() <= 40
+    assert curve["selected"].sum() == 1
+    assert len(model.estimators_) == model.n_estimators == curve.loc[curve["selected"], "n_estimators"].iloc[0]
+    assert curve.loc[curve["selected"], "oob_score"].iloc[0] >= curve["oob_score"].max() - 0.01
+    assert model.predict(X[:5]).shape == (5,)
+
+def test_grow_forest_missing_auto_size():
+    with pytest.raises(ValueError):
+        grow_forest(np.zeros((10, 2)), np.zeros(10), np.arange(10), {"params": {}})
+
+# ---------- Model Backend Tests ----------
+
+def test_build_model_from_type():
+    model = build_model({"type": "HistGradientBoostingClassifier", "params": {"max_iter": 7}})
+    assert isinstance(model, HistGradientBoostingClassifier)
+    assert model.max_iter == 7
+
+def test_build_model_unknown_type():
+    with pytest.raises(ValueError):
+        build_model({"type": "NotAModel", "params": {}})